@@ -1,5 +1,5 @@
 from bson import ObjectId
-from backend.db import expenses_col
+from backend.db import expenses_col, insights_col
 
 def monthly_summary(user_id):
     pipeline = [
@@ -33,4 +33,11 @@ def category_trend(user_id):
         }},
         {'$sort': {'total': -1}}
     ]
-    return list(expenses_col.aggregate(pipeline))
\ No newline at end of file
+    return list(expenses_col.aggregate(pipeline))
+
+def spending_insights(user_id):
+    """
+    Latest spike flags and month-end projection for the user, as written by
+    scripts/scan_spending.py. None if the scan hasn't covered this user yet.
+    """
+    return insights_col.find_one({'user_id': ObjectId(user_id)}, {'_id': 0})
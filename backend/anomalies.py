@@ -0,0 +1,123 @@
+# backend/anomalies.py
+#
+# Vectorized spending-spike detection and month-end forecasts for many users
+# at once. Everything works on a dense (series x day) matrix of daily totals,
+# where a series is one (user, category) pair; no per-user Python loops.
+
+import numpy as np
+
+WINDOW       = 28     # days of history forming a category's baseline
+RECENT       = 7      # most recent days that are checked for spikes
+Z_THRESHOLD  = 3.25   # calibrated with `scan_spending.py --benchmark`
+MIN_OBS      = 3      # spending days needed in the window for a baseline
+PRIOR_WEIGHT = 16     # pseudo-observations of the pooled spread per series
+POOL_MIN_OBS = 8      # series with this many days define the pooled spread
+MIN_AMOUNT   = 20.0   # ignore spikes smaller than this
+CHUNK        = 100_000
+
+# Daily totals are right-skewed and a series has only a handful of spending
+# days per window, so scoring is done on log1p(amount) (where the spread is
+# roughly scale-free) and each series' variance is shrunk towards the variance
+# pooled over all well-observed series.
+
+
+def baseline_stats(daily: np.ndarray, window: int = WINDOW, recent: int = RECENT):
+    """
+    For the last `recent` days of each row of `daily` (shape series x days,
+    days >= window + recent), the mean and variance of log1p(total) over the
+    non-zero days in the preceding `window` days.
+
+    Returns (log_mean, log_var, n_obs), each shaped (series, recent).
+    """
+    n_days = daily.shape[1]
+    if n_days < window + recent:
+        raise ValueError(f"need at least {window + recent} days, got {n_days}")
+
+    x = np.log1p(daily.astype(np.float64))
+    pad = np.zeros((x.shape[0], 1))
+    cs  = np.concatenate([pad, np.cumsum(x, axis=1)], axis=1)
+    cs2 = np.concatenate([pad, np.cumsum(x * x, axis=1)], axis=1)
+    csn = np.concatenate([pad, np.cumsum(x > 0, axis=1)], axis=1)
+
+    t  = np.arange(n_days - recent, n_days)   # days being scored
+    lo = t - window                            # baseline is [t - window, t)
+    s, s2, n = cs[:, t] - cs[:, lo], cs2[:, t] - cs2[:, lo], csn[:, t] - csn[:, lo]
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.where(n > 0, s / n, 0.0)
+        var  = np.clip(np.where(n > 0, s2 / n, 0.0) - mean * mean, 0.0, None)
+    return mean, var, n
+
+
+def spike_scores(daily: np.ndarray, pooled_var: float, window: int = WINDOW,
+                 recent: int = RECENT, prior_weight: float = PRIOR_WEIGHT):
+    """
+    Log-space z-scores of the last `recent` days against each series'
+    baseline, with the variance shrunk towards `pooled_var` and widened
+    for the uncertainty of the baseline mean.
+
+    Returns (baseline, z, n_obs), each shaped (series, recent); baseline
+    is the typical (geometric-mean) daily total in currency units.
+    """
+    mean, var, n = baseline_stats(daily, window, recent)
+    shrunk = (n * var + prior_weight * pooled_var) / (n + prior_weight)
+    spread = np.sqrt(shrunk * (1 + 1 / np.maximum(n, 1)))
+    x = np.log1p(daily[:, daily.shape[1] - recent:].astype(np.float64))
+    return np.expm1(mean), (x - mean) / spread, n
+
+
+def pooled_variance(daily: np.ndarray, window: int = WINDOW, recent: int = RECENT,
+                    min_obs: int = POOL_MIN_OBS, chunk: int = CHUNK) -> float:
+    """
+    Median log-space variance over baselines with at least `min_obs` days.
+    """
+    pooled = []
+    for start in range(0, daily.shape[0], chunk):
+        _, var, n = baseline_stats(daily[start:start + chunk], window, recent)
+        pooled.append(var[n >= min_obs])
+    pooled = np.concatenate(pooled)
+    return float(np.median(pooled)) if pooled.size else 0.5
+
+
+def find_spikes(daily: np.ndarray, window: int = WINDOW, recent: int = RECENT,
+                threshold: float = Z_THRESHOLD, min_obs: int = MIN_OBS,
+                min_amount: float = MIN_AMOUNT, chunk: int = CHUNK):
+    """
+    Flag (series, day) cells among the last `recent` days whose total is a
+    spike against that series' own baseline. Rows are processed in chunks of
+    `chunk` series to bound memory.
+
+    Returns arrays (series_idx, day_idx, amount, baseline, z); day_idx
+    indexes columns of `daily`.
+    """
+    n_days = daily.shape[1]
+    pooled_var = pooled_variance(daily, window, recent, chunk=chunk)
+    out = [[] for _ in range(5)]
+    for start in range(0, daily.shape[0], chunk):
+        block = daily[start:start + chunk]
+        baseline, z, n = spike_scores(block, pooled_var, window, recent)
+        amount = block[:, n_days - recent:]
+        hit = (n >= min_obs) & (amount >= min_amount) & (z >= threshold)
+        rows, cols = np.nonzero(hit)
+        for acc, arr in zip(out, (rows + start, cols + n_days - recent,
+                                  amount[rows, cols], baseline[rows, cols], z[rows, cols])):
+            acc.append(arr)
+    return tuple(np.concatenate(acc) if acc else np.empty(0) for acc in out)
+
+
+def forecast_month_end(daily: np.ndarray, series_user: np.ndarray, n_users: int,
+                       month_start_col: int, days_in_month: int, window: int = WINDOW):
+    """
+    Project each user's month-end spend as month-to-date spend plus the
+    trailing `window`-day daily rate times the days left in the month.
+    The last column of `daily` is taken as "today".
+
+    Returns (month_to_date, daily_rate, projected), each of length n_users.
+    """
+    n_days = daily.shape[1]
+    mtd_series  = daily[:, month_start_col:].sum(axis=1, dtype=np.float64)
+    rate_series = daily[:, n_days - window:].sum(axis=1, dtype=np.float64) / window
+    mtd  = np.bincount(series_user, weights=mtd_series, minlength=n_users)
+    rate = np.bincount(series_user, weights=rate_series, minlength=n_users)
+    days_left = days_in_month - (n_days - month_start_col)
+    return mtd, rate, mtd + rate * max(days_left, 0)
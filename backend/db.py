@@ -7,20 +7,30 @@ import certifi
 
 load_dotenv()
 
-USER     = quote_plus(os.getenv("MONGO_USER"))
-PASSWORD = quote_plus(os.getenv("MONGO_PASS"))
-HOST     = os.getenv("MONGO_HOST")
 DBNAME   = os.getenv("MONGO_DBNAME", "dollar_bill")
 
-MONGO_URI = (
-    f"mongodb+srv://{USER}:{PASSWORD}@{HOST}/{DBNAME}"
-    "?retryWrites=true&w=majority"
-)
+# MONGO_URI overrides the Atlas settings, e.g. mongodb://localhost:27017 for
+# a local server (load tests, development)
+MONGO_URI = os.getenv("MONGO_URI")
+
+if MONGO_URI:
+    client = MongoClient(MONGO_URI, serverSelectionTimeoutMS=5000)
+else:
+    USER     = quote_plus(os.getenv("MONGO_USER"))
+    PASSWORD = quote_plus(os.getenv("MONGO_PASS"))
+    HOST     = os.getenv("MONGO_HOST")
+
+    MONGO_URI = (
+        f"mongodb+srv://{USER}:{PASSWORD}@{HOST}/{DBNAME}"
+        "?retryWrites=true&w=majority"
+    )
+
+    # tell PyMongo to use certifi’s CA bundle
+    client = MongoClient(MONGO_URI, tlsCAFile=certifi.where(), serverSelectionTimeoutMS=5000)
 
-# tell PyMongo to use certifi’s CA bundle
-client = MongoClient(MONGO_URI, tlsCAFile=certifi.where(), serverSelectionTimeoutMS=5000)
 db     = client[DBNAME]
 
 users_col    = db["users"]
 expenses_col = db["expenses"]
 groups_col   = db["groups"]
+insights_col = db["insights"]   # written by scripts/scan_spending.py
@@ -1,8 +1,11 @@
 # backend/expenses.py
 
+import re
 from datetime import datetime
 from bson import ObjectId
+from pymongo.results import InsertOneResult, UpdateResult, DeleteResult
 from backend.db import expenses_col
+from backend import write_behind
 
 def add_expense(user_id: str,
                 amount: float,
@@ -13,6 +16,8 @@ def add_expense(user_id: str,
                 payer_id: str = None):
     """
     Insert a new expense document, converting date_str (ISO) into a datetime.
+    In write-behind mode the insert is journaled and an unacknowledged
+    result carrying the client-generated _id is returned.
     """
     try:
         date_obj = datetime.fromisoformat(date_str)
@@ -28,6 +33,10 @@ def add_expense(user_id: str,
         'group_id':    ObjectId(group_id) if group_id else None,
         'payer_id':    ObjectId(payer_id) if payer_id else None
     }
+    if write_behind.ENABLED:
+        doc['_id'] = ObjectId()
+        write_behind.enqueue(user_id, doc['_id'], 'insert', doc)
+        return InsertOneResult(doc['_id'], acknowledged=False)
     return expenses_col.insert_one(doc)
 
 def update_expense(expense_id: str,
@@ -55,6 +64,11 @@ def update_expense(expense_id: str,
     if not updates:
         return None  # nothing to update
 
+    if write_behind.ENABLED:
+        # Validate ids now, as the synchronous path would, not at flush time
+        expense_id, user_id = ObjectId(expense_id), ObjectId(user_id)
+        write_behind.enqueue(user_id, expense_id, 'set', updates)
+        return UpdateResult({}, acknowledged=False)
     return expenses_col.update_one(
         {'_id': ObjectId(expense_id), 'user_id': ObjectId(user_id)},
         {'$set': updates}
@@ -64,6 +78,10 @@ def delete_expense(expense_id: str, user_id: str):
     """
     Delete an expense by its ID, ensuring it belongs to the given user.
     """
+    if write_behind.ENABLED:
+        expense_id, user_id = ObjectId(expense_id), ObjectId(user_id)
+        write_behind.enqueue(user_id, expense_id, 'delete', {})
+        return DeleteResult({}, acknowledged=False)
     return expenses_col.delete_one({
         '_id': ObjectId(expense_id),
         'user_id': ObjectId(user_id)
@@ -72,9 +90,11 @@ def delete_expense(expense_id: str, user_id: str):
 def list_expenses(user_id: str,
                   start_date: str = None,
                   end_date: str = None,
-                  category: str = None):
+                  category: str = None,
+                  limit: int = None):
     """
     Fetch expenses for a user, optionally filtered by date range or category.
+    If `limit` is given, only the most recent `limit` expenses are returned.
     Returns a list of dicts.
     """
     query = {'user_id': ObjectId(user_id)}
@@ -92,7 +112,67 @@ def list_expenses(user_id: str,
             raise ValueError(f"Invalid end_date: {end_date!r}")
 
     cursor = expenses_col.find(query).sort('date', -1)
-    return list(cursor)
+    if not write_behind.ENABLED:
+        if limit:
+            cursor = cursor.limit(limit)
+        return list(cursor)
+
+    # Read-your-writes: merge this user's unflushed changes. Over-fetch so
+    # pending deletes don't leave the page short.
+    pending = write_behind.pending_changes(user_id)
+    if limit:
+        cursor = cursor.limit(limit + len(pending))
+    date_range = query.get('date', {})
+
+    def matches(doc):
+        return ((not category or doc.get('category') == category) and
+                ('$gte' not in date_range or doc['date'] >= date_range['$gte']) and
+                ('$lte' not in date_range or doc['date'] <= date_range['$lte']))
+
+    docs = write_behind.overlay(user_id, list(cursor), matches, pending)
+    docs.sort(key=lambda d: d['date'], reverse=True)
+    return docs[:limit] if limit else docs
+
+def search_expenses(user_id: str, query: str, limit: int = 20):
+    """
+    Full-text search over a user's expense descriptions, best matches first.
+    Served by the {user_id: 1, description: 'text'} index (see mongo-setup.js),
+    so only the matching rows are read.
+    """
+    query = (query or '').strip()
+    if not query:
+        return []
+    # Read the journal before MongoDB so a flush in between can't hide a write
+    pending = write_behind.pending_changes(user_id) if write_behind.ENABLED else None
+    cursor = expenses_col.find(
+        {'user_id': ObjectId(user_id), '$text': {'$search': query}},
+        {'score': {'$meta': 'textScore'}}
+    ).sort([('score', {'$meta': 'textScore'}), ('date', -1)]).limit(limit)
+    if not write_behind.ENABLED:
+        return list(cursor)
+
+    # Pending changes are matched by a plain word check, not the text index
+    words = query.lower().split()
+
+    def matches(doc):
+        description = doc.get('description', '').lower()
+        return any(w in description for w in words)
+
+    docs = write_behind.overlay(user_id, list(cursor), matches, pending)
+    docs.sort(key=lambda d: d['date'], reverse=True)
+    docs.sort(key=lambda d: d.get('score', 0), reverse=True)
+    return docs[:limit]
+
+def category_suggestions(user_id: str, prefix: str, limit: int = 10) -> list[str]:
+    """
+    Distinct categories of this user starting with `prefix`, for autocomplete.
+    The anchored, case-sensitive regex is answered from the
+    {user_id: 1, category: 1} index without touching documents.
+    """
+    query = {'user_id': ObjectId(user_id)}
+    if prefix:
+        query['category'] = {'$regex': '^' + re.escape(prefix)}
+    return sorted(expenses_col.distinct('category', query))[:limit]
 
 # ---- ALIAS FOR FRONTEND ----
 # The UI expects fetch_expenses(), so we alias it here:
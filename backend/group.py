@@ -34,17 +34,42 @@ def create_group(name: str, member_usernames: list[str]):
     return groups_col.insert_one(doc)
 
 
+def list_group_members(group_name: str) -> list[str]:
+    """
+    Return the usernames of the members of the group named `group_name`.
+    """
+    group = groups_col.find_one({'name': group_name})
+    if not group:
+        raise ValueError(f"Group '{group_name}' not found")
+    users = users_col.find({'_id': {'$in': group['members']}}, {'username': 1})
+    return [u['username'] for u in users]
+
+
+SPLIT_TYPES = ('equal', 'percentage', 'exact')
+
+
 def add_group_expense(
     group_name: str,
     payer_username: str,
     amount: float,
     category: str,
     date_str: str,
-    description: str
+    description: str,
+    split: str = 'equal',
+    participants: list[str] = None,
+    shares: dict[str, float] = None
 ):
     """
     Add an expense for the group named `group_name`,
     paid by the user `payer_username`.
+
+    `split` decides who owes what:
+      - 'equal':      split evenly among `participants` (usernames; default
+                      all current members)
+      - 'percentage': `shares` maps username -> percent, summing to 100
+      - 'exact':      `shares` maps username -> amount, summing to `amount`
+    Participants are stored on the expense as [{user_id, weight}], each
+    owing amount * weight / sum(weights).
     """
     # find the group
     group = groups_col.find_one({'name': group_name})
@@ -62,13 +87,45 @@ def add_group_expense(
     except Exception:
         raise ValueError(f"Invalid date format: {date_str!r}")
 
+    # resolve the weights
+    if split not in SPLIT_TYPES:
+        raise ValueError(f"Unknown split type: {split!r}")
+    if split == 'equal':
+        if participants is None:
+            weights = {m_id: 1.0 for m_id in group['members']}
+        else:
+            weights = {uname: 1.0 for uname in participants}
+    else:
+        if not shares:
+            raise ValueError(f"A {split} split needs shares")
+        if any(v < 0 for v in shares.values()):
+            raise ValueError("Shares cannot be negative")
+        expected = 100.0 if split == 'percentage' else float(amount)
+        if abs(sum(shares.values()) - expected) > 0.01:
+            raise ValueError(f"Shares must add up to {expected:g}, got {sum(shares.values()):g}")
+        weights = {uname: float(v) for uname, v in shares.items()}
+
+    # map usernames to member ids (one query)
+    names = [k for k in weights if isinstance(k, str)]
+    if names:
+        found = {u['username']: u['_id']
+                 for u in users_col.find({'username': {'$in': names}}, {'username': 1})}
+        for uname in names:
+            if found.get(uname) not in group['members']:
+                raise ValueError(f"User '{uname}' is not a member of '{group_name}'")
+        weights = {found[k]: w for k, w in weights.items()}
+    if not weights or sum(weights.values()) <= 0:
+        raise ValueError("An expense needs at least one participant with a share")
+
     doc = {
-        'user_id':     payer['_id'],
-        'group_id':    group['_id'],
-        'amount':      float(amount),
-        'category':    category,
-        'date':        date_obj,
-        'description': description
+        'user_id':      payer['_id'],
+        'group_id':     group['_id'],
+        'amount':       float(amount),
+        'category':     category,
+        'date':         date_obj,
+        'description':  description,
+        'split':        split,
+        'participants': [{'user_id': m_id, 'weight': w} for m_id, w in weights.items()]
     }
     return expenses_col.insert_one(doc)
 
@@ -76,29 +133,42 @@ def add_group_expense(
 def compute_group_balances(group_name: str) -> dict[str, float]:
     """
     For the group named `group_name`, compute each member’s net balance
-    (paid minus equal share). Returns a map: username -> balance.
+    (paid minus owed share). Returns a map: username -> balance.
+
+    Shares come from each expense's `participants`; older expenses without
+    them are split equally across the current members. All of it is done in
+    one aggregation: every expense unwinds into a +amount entry for the payer
+    and a -share entry per participant, summed per user.
     """
     group = groups_col.find_one({'name': group_name})
     if not group:
         raise ValueError(f"Group '{group_name}' not found")
 
     members = group['members']
+    legacy_split = [{'user_id': m_id, 'weight': 1} for m_id in members]
 
-    # sum paid per member_id
     pipeline = [
         {'$match': {'group_id': group['_id']}},
-        {'$group': {'_id': '$user_id', 'paid': {'$sum': '$amount'}}}
+        {'$project': {'entries': {'$let': {
+            'vars': {'parts': {'$ifNull': ['$participants', legacy_split]}},
+            'in': {'$concatArrays': [
+                [{'user_id': '$user_id', 'net': '$amount'}],
+                {'$map': {'input': '$$parts', 'as': 'p', 'in': {
+                    'user_id': '$$p.user_id',
+                    'net': {'$multiply': [
+                        -1, '$amount',
+                        {'$divide': ['$$p.weight', {'$sum': '$$parts.weight'}]}
+                    ]}
+                }}}
+            ]}
+        }}}},
+        {'$unwind': '$entries'},
+        {'$group': {'_id': '$entries.user_id', 'balance': {'$sum': '$entries.net'}}}
     ]
-    paid_map = {rec['_id']: rec['paid'] for rec in expenses_col.aggregate(pipeline)}
-
-    total = sum(paid_map.values())
-    share = total / len(members)
-
-    # map back to username
-    balances = {}
-    for m_id in members:
-        user = users_col.find_one({'_id': m_id})
-        uname = user['username'] if user else str(m_id)
-        balances[uname] = paid_map.get(m_id, 0) - share
+    net_map = {rec['_id']: rec['balance'] for rec in expenses_col.aggregate(pipeline)}
 
-    return balances
+    # map back to username (one query); former members with activity are kept
+    ids = list(dict.fromkeys(list(members) + list(net_map)))
+    names = {u['_id']: u['username']
+             for u in users_col.find({'_id': {'$in': ids}}, {'username': 1})}
+    return {names.get(m_id, str(m_id)): net_map.get(m_id, 0) for m_id in ids}
@@ -0,0 +1,79 @@
+# backend/vega.py
+#
+# Vega-Lite chart specs for the Analytics tab. These are rendered in the
+# browser, so the server only ships a few hundred bytes of JSON per chart
+# instead of rasterizing a PNG with matplotlib on every rerun.
+
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# 'png' (server-side matplotlib, see backend/visuals.py) or 'vega'
+CHART_MODE = os.getenv("CHART_MODE", "png").strip().lower()
+
+_SCHEMA = 'https://vega.github.io/schema/vega-lite/v5.json'
+
+
+def spec_monthly(data):
+    """
+    Line chart of total spending per month, with hover tooltips and
+    drag/scroll zoom on the x axis.
+    """
+    values = sorted(
+        ({'period': f"{r['_id']['year']}-{int(r['_id']['month']):02d}-01",
+          'total': round(float(r['total']), 2)} for r in data),
+        key=lambda v: v['period']
+    )
+    return {
+        '$schema': _SCHEMA,
+        'title': 'Monthly Spending Trend',
+        'data': {'values': values},
+        'mark': {'type': 'line', 'point': True, 'tooltip': True},
+        'params': [{'name': 'zoom', 'bind': 'scales',
+                    'select': {'type': 'interval', 'encodings': ['x']}}],
+        'encoding': {
+            'x': {'field': 'period', 'type': 'temporal', 'timeUnit': 'utcyearmonth',
+                  'title': 'Month'},
+            'y': {'field': 'total', 'type': 'quantitative', 'title': 'Total Spent'},
+        },
+    }
+
+
+def spec_yearly(data):
+    """
+    Bar chart of total spending per year.
+    """
+    values = sorted(
+        ({'year': str(r['_id']['year']), 'total': round(float(r['total']), 2)}
+         for r in data),
+        key=lambda v: v['year']
+    )
+    return {
+        '$schema': _SCHEMA,
+        'title': 'Yearly Spending',
+        'data': {'values': values},
+        'mark': {'type': 'bar', 'tooltip': True},
+        'encoding': {
+            'x': {'field': 'year', 'type': 'ordinal', 'title': 'Year'},
+            'y': {'field': 'total', 'type': 'quantitative', 'title': 'Total Spent'},
+        },
+    }
+
+
+def spec_category(data):
+    """
+    Donut chart of spending by category.
+    """
+    values = [{'category': r['_id']['category'] if isinstance(r['_id'], dict) else str(r['_id']),
+               'total': round(float(r['total']), 2)} for r in data]
+    return {
+        '$schema': _SCHEMA,
+        'title': 'Spending by Category',
+        'data': {'values': values},
+        'mark': {'type': 'arc', 'innerRadius': 40, 'tooltip': True},
+        'encoding': {
+            'theta': {'field': 'total', 'type': 'quantitative', 'stack': True},
+            'color': {'field': 'category', 'type': 'nominal', 'title': 'Category'},
+        },
+    }
@@ -4,9 +4,9 @@ import matplotlib.pyplot as plt
 from io import BytesIO
 import pandas as pd
 
-def plot_monthly(data):
+def _draw_monthly(ax, data):
     """
-    Line chart of total spending per month.
+    Draw the monthly spending line onto an existing Axes.
     """
     df = pd.DataFrame(data) if isinstance(data, list) else data.copy()
     df['period'] = df['_id'].apply(
@@ -14,22 +14,59 @@ def plot_monthly(data):
     )
     df = df.sort_values('period')
 
-    fig, ax = plt.subplots()
     ax.plot(df['period'], df['total'], marker='o', label='Total')
     ax.set_xlabel('Month')
     ax.set_ylabel('Total Spent')
     ax.set_title('Monthly Spending Trend')
     ax.legend()
-    plt.xticks(rotation=45, ha='right')
-    fig.tight_layout()
+    plt.setp(ax.get_xticklabels(), rotation=45, ha='right')
+
+
+def _draw_category(ax, data):
+    """
+    Draw the category pie (with legend) onto an existing Axes.
+    """
+    df = pd.DataFrame(data) if isinstance(data, list) else data.copy()
+    df['category'] = df['_id'].apply(
+        lambda x: x if not isinstance(x, dict) else str(x)
+    )
+    labels = df['category']
+    sizes  = df['total']
+
+    wedges, texts, autotexts = ax.pie(
+        sizes,
+        autopct='%1.1f%%',
+        startangle=90
+    )
+    ax.set_title('Spending by Category')
+    ax.axis('equal')
+    ax.legend(
+        wedges,
+        labels,
+        title='Category',
+        loc='center left',
+        bbox_to_anchor=(1, 0.5)
+    )
+
 
+def _to_buffer(fig, fmt='png'):
     buf = BytesIO()
-    fig.savefig(buf, format='png')
+    fig.savefig(buf, format=fmt)
     buf.seek(0)
     plt.close(fig)
     return buf
 
 
+def plot_monthly(data):
+    """
+    Line chart of total spending per month.
+    """
+    fig, ax = plt.subplots()
+    _draw_monthly(ax, data)
+    fig.tight_layout()
+    return _to_buffer(fig)
+
+
 def plot_yearly(data):
     """
     Bar chart of total spending per year.
@@ -44,46 +81,37 @@ def plot_yearly(data):
     ax.set_ylabel('Total Spent')
     ax.set_title('Yearly Spending')
     ax.legend()
-    plt.xticks(rotation=45, ha='right')
+    plt.setp(ax.get_xticklabels(), rotation=45, ha='right')
     fig.tight_layout()
-
-    buf = BytesIO()
-    fig.savefig(buf, format='png')
-    buf.seek(0)
-    plt.close(fig)
-    return buf
+    return _to_buffer(fig)
 
 
 def plot_category(data):
     """
     Pie chart of spending by category.
     """
-    df = pd.DataFrame(data) if isinstance(data, list) else data.copy()
-    df['category'] = df['_id'].apply(
-        lambda x: x if not isinstance(x, dict) else str(x)
-    )
-    labels = df['category']
-    sizes  = df['total']
-
     fig, ax = plt.subplots()
-    wedges, texts, autotexts = ax.pie(
-        sizes,
-        autopct='%1.1f%%',
-        startangle=90
-    )
-    ax.set_title('Spending by Category')
-    ax.axis('equal')
-    ax.legend(
-        wedges,
-        labels,
-        title='Category',
-        loc='center left',
-        bbox_to_anchor=(1, 0.5)
-    )
+    _draw_category(ax, data)
     fig.tight_layout()
+    return _to_buffer(fig)
 
-    buf = BytesIO()
-    fig.savefig(buf, format='png')
-    buf.seek(0)
-    plt.close(fig)
-    return buf
+
+def plot_statement(title, monthly_data, category_data, fmt='png'):
+    """
+    One-page monthly statement: trailing monthly trend next to the
+    category breakdown for the statement month (skipped when there is no
+    spending, e.g. only $0.00 expenses). `fmt` is 'png' or 'pdf'.
+    """
+    fig, (ax_trend, ax_cat) = plt.subplots(1, 2, figsize=(12, 5))
+    fig.suptitle(title)
+    if monthly_data:
+        _draw_monthly(ax_trend, monthly_data)
+    else:
+        ax_trend.set_axis_off()
+    if category_data and sum(rec['total'] for rec in category_data) > 0:
+        _draw_category(ax_cat, category_data)
+    else:
+        ax_cat.text(0.5, 0.5, 'No expenses this month', ha='center', va='center')
+        ax_cat.set_axis_off()
+    fig.tight_layout()
+    return _to_buffer(fig, fmt)
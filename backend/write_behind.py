@@ -0,0 +1,328 @@
+# backend/write_behind.py
+#
+# Optional write-behind mode for personal expense mutations (WRITE_BEHIND=1).
+#
+# add/update/delete append to a local SQLite journal and return immediately;
+# a background thread flushes the journal to MongoDB with bulk_write. Repeated
+# edits to the same expense are coalesced into one operation, every operation
+# is idempotent (inserts are upserts keyed by a client-generated _id) so a
+# crash between "applied" and "removed from journal" is harmless, and failed
+# users back off exponentially while everyone else keeps flushing.
+#
+# Connection problems and unconfirmed write concern are retried indefinitely
+# (with capped backoff) without counting against a row; only per-document
+# write errors, e.g. a validator rejection, can dead-letter a row.
+#
+# Expense lists and search go through overlay() so users see their own pending
+# changes; aggregates (analytics, suggestions, group balances) only read
+# MongoDB, so the app shows a notice from user_backlog() while changes wait.
+
+import os
+import atexit
+import logging
+import sqlite3
+import threading
+import time
+from bson import ObjectId, json_util
+from bson.errors import InvalidId
+from pymongo import ReplaceOne, UpdateOne, DeleteOne
+from pymongo.errors import BulkWriteError, ConnectionFailure, PyMongoError
+from backend.db import expenses_col
+
+logger = logging.getLogger(__name__)
+
+ENABLED        = os.getenv("WRITE_BEHIND", "").strip().lower() in ("1", "true", "yes")
+JOURNAL_PATH   = os.getenv("WRITE_BEHIND_JOURNAL", "write_behind.sqlite3")
+FLUSH_INTERVAL = float(os.getenv("WRITE_BEHIND_INTERVAL", "0.5"))   # seconds
+BATCH_SIZE     = 1000     # journal rows per flush
+MAX_ATTEMPTS   = 10       # write errors before a row is parked as dead
+BACKOFF_BASE   = 0.5      # seconds, doubled per attempt
+BACKOFF_CAP    = 60.0
+
+_lock   = threading.Lock()
+_wakeup = threading.Event()
+_stop   = threading.Event()
+_conn   = None
+_worker = None
+
+# process-wide backoff while MongoDB is unreachable (touched by the flusher only)
+_outage_streak = 0
+_outage_until  = 0.0
+
+
+def _db() -> sqlite3.Connection:
+    """
+    Lazily open the journal; callers must hold _lock.
+    """
+    global _conn
+    if _conn is None:
+        _conn = sqlite3.connect(JOURNAL_PATH, check_same_thread=False, isolation_level=None)
+        _conn.execute("PRAGMA journal_mode=WAL")
+        _conn.execute("PRAGMA synchronous=FULL")
+        _conn.execute("""
+            CREATE TABLE IF NOT EXISTS journal (
+                seq          INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id      TEXT    NOT NULL,
+                expense_id   TEXT    NOT NULL,
+                op           TEXT    NOT NULL,
+                payload      TEXT    NOT NULL,
+                attempts     INTEGER NOT NULL DEFAULT 0,
+                next_attempt REAL    NOT NULL DEFAULT 0,
+                dead         INTEGER NOT NULL DEFAULT 0
+            )""")
+        _conn.execute("CREATE INDEX IF NOT EXISTS journal_user ON journal (user_id, seq)")
+    return _conn
+
+
+def enqueue(user_id, expense_id, op: str, payload: dict):
+    """
+    Durably record a mutation. `op` is 'insert' (payload = full document),
+    'set' (payload = changed fields) or 'delete' (payload ignored).
+    """
+    with _lock:
+        _db().execute(
+            "INSERT INTO journal (user_id, expense_id, op, payload) VALUES (?, ?, ?, ?)",
+            (str(user_id), str(expense_id), op, json_util.dumps(payload))
+        )
+    start_worker()
+    _wakeup.set()
+
+
+def _coalesce(rows) -> dict:
+    """
+    Fold journal rows (in seq order) into one net change per expense.
+    Returns {(user_id, expense_id): (kind, data, [seq, ...])}, kind being
+    'insert', 'set' or 'delete'.
+    """
+    net = {}
+    for seq, user_id, expense_id, op, payload in rows:
+        key = (user_id, expense_id)
+        kind, data, seqs = net.get(key, (None, None, []))
+        fields = json_util.loads(payload)
+        if op == 'insert':
+            kind, data = 'insert', fields
+        elif op == 'set':
+            if kind == 'delete':
+                pass                      # updating a deleted expense matches nothing
+            elif kind == 'insert':
+                data = {**data, **fields}
+            else:
+                kind, data = 'set', {**(data or {}), **fields}
+        elif op == 'delete':
+            kind, data = 'delete', None   # also emitted after an unflushed insert, in
+                                          # case that insert already reached MongoDB
+        net[key] = (kind, data, seqs + [seq])
+    return net
+
+
+def _to_request(user_id: str, expense_id: str, kind: str, data: dict):
+    _id, uid = ObjectId(expense_id), ObjectId(user_id)
+    if kind == 'insert':
+        return ReplaceOne({'_id': _id}, data, upsert=True)
+    if kind == 'set':
+        return UpdateOne({'_id': _id, 'user_id': uid}, {'$set': data})
+    return DeleteOne({'_id': _id, 'user_id': uid})
+
+
+def _outage(now: float, exc: Exception):
+    """
+    Back off the whole flusher after a connection-level failure. Journal
+    rows are left untouched so an outage never dead-letters anything.
+    """
+    global _outage_streak, _outage_until
+    _outage_streak += 1
+    delay = min(BACKOFF_CAP, BACKOFF_BASE * 2 ** (_outage_streak - 1))
+    _outage_until = now + delay
+    logger.warning("write-behind: MongoDB unavailable (%r), retrying in %.1fs", exc, delay)
+
+
+def flush() -> int:
+    """
+    Push one batch of ready journal rows to MongoDB. Users in backoff are
+    skipped as a whole so their operations stay in order.
+    Returns the number of journal rows cleared.
+    """
+    global _outage_streak
+    now = time.time()
+    if now < _outage_until:
+        return 0
+    with _lock:
+        rows = _db().execute("""
+            SELECT seq, user_id, expense_id, op, payload FROM journal
+            WHERE dead = 0 AND user_id NOT IN (
+                SELECT user_id FROM journal WHERE dead = 0 AND next_attempt > ?)
+            ORDER BY seq LIMIT ?""", (now, BATCH_SIZE)).fetchall()
+    if not rows:
+        return 0
+
+    net = _coalesce(rows)
+    keys, requests, invalid = [], [], {}
+    for key, (kind, data, seqs) in net.items():
+        try:
+            requests.append(_to_request(*key, kind, data))
+            keys.append(key)
+        except InvalidId as exc:
+            # can never be written; park it rather than block the batch
+            invalid[key] = repr(exc)
+    if invalid:
+        _record_write_errors(now, [s for key in invalid for s in net[key][2]], invalid, dead=True)
+    if not requests:
+        return 0
+
+    failed = {}      # index into keys -> error message, for per-document write errors
+    try:
+        expenses_col.bulk_write(requests, ordered=False)
+    except BulkWriteError as exc:
+        failed = {err['index']: err.get('errmsg', '') for err in exc.details.get('writeErrors', [])}
+        if exc.details.get('writeConcernErrors'):
+            # w=majority not confirmed: the writes may roll back, so keep every
+            # row and replay the whole (idempotent) batch later
+            _outage(now, exc)
+            failed_seqs = [s for i in failed for s in net[keys[i]][2]]
+            _record_write_errors(now, failed_seqs, {keys[i]: m for i, m in failed.items()})
+            return 0
+    except ConnectionFailure as exc:
+        _outage(now, exc)
+        return 0
+    except PyMongoError as exc:
+        failed = {i: repr(exc) for i in range(len(keys))}
+    _outage_streak = 0
+
+    done_seqs, retry_seqs = [], []
+    for i, key in enumerate(keys):
+        (retry_seqs if i in failed else done_seqs).extend(net[key][2])
+
+    with _lock:
+        conn = _db()
+        conn.execute("BEGIN IMMEDIATE")
+        conn.executemany("DELETE FROM journal WHERE seq = ?", [(s,) for s in done_seqs])
+        conn.execute("COMMIT")
+    _record_write_errors(now, retry_seqs, {keys[i]: m for i, m in failed.items()})
+    return len(done_seqs)
+
+
+def _record_write_errors(now: float, seqs: list, errors: dict, dead: bool = False):
+    """
+    Count a write error against journal rows, backing their user off and
+    dead-lettering rows that reached MAX_ATTEMPTS (or right away if `dead`).
+    `errors` maps (user_id, expense_id) -> message for logging.
+    """
+    if not seqs:
+        return
+    with _lock:
+        conn = _db()
+        conn.execute("BEGIN IMMEDIATE")
+        conn.executemany("""
+            UPDATE journal SET
+                attempts     = attempts + 1,
+                next_attempt = ? + MIN(?, ? * (1 << attempts)),
+                dead         = attempts + 1 >= ? OR ?
+            WHERE seq = ?""",
+            [(now, BACKOFF_CAP, BACKOFF_BASE, MAX_ATTEMPTS, dead, s) for s in seqs])
+        parked = conn.execute(
+            f"SELECT DISTINCT user_id, expense_id FROM journal "
+            f"WHERE dead = 1 AND seq IN ({','.join('?' * len(seqs))})", seqs
+        ).fetchall()
+        conn.execute("COMMIT")
+    for user_id, expense_id in parked:
+        logger.error("write-behind: gave up on expense %s of user %s: %s",
+                     expense_id, user_id, errors.get((user_id, expense_id), ''))
+
+
+def dead_letter_count() -> int:
+    """
+    Number of journal rows parked as dead (never written to MongoDB).
+    """
+    with _lock:
+        return _db().execute("SELECT COUNT(*) FROM journal WHERE dead = 1").fetchone()[0]
+
+
+def user_backlog(user_id: str) -> tuple[int, int]:
+    """
+    (pending, dead) number of this user's expenses with unflushed changes,
+    for telling the user that aggregate views don't include them yet.
+    """
+    with _lock:
+        counts = dict(_db().execute(
+            "SELECT dead, COUNT(DISTINCT expense_id) FROM journal "
+            "WHERE user_id = ? GROUP BY dead", (str(user_id),)
+        ).fetchall())
+    return counts.get(0, 0), counts.get(1, 0)
+
+
+def pending_changes(user_id: str) -> dict:
+    """
+    Net unflushed changes for one user: {expense_id: (kind, data)}.
+    """
+    with _lock:
+        rows = _db().execute(
+            "SELECT seq, user_id, expense_id, op, payload FROM journal "
+            "WHERE user_id = ? AND dead = 0 ORDER BY seq", (str(user_id),)
+        ).fetchall()
+    return {eid: (kind, data) for (_, eid), (kind, data, _) in _coalesce(rows).items()}
+
+
+def overlay(user_id: str, docs: list, matches=lambda doc: True, pending: dict = None) -> list:
+    """
+    Apply this user's pending changes on top of documents read from MongoDB
+    (read-your-writes). `matches` re-checks the caller's filter on changed
+    or newly inserted documents; `pending` may be passed if the caller
+    already fetched pending_changes(). Order of the result is not preserved.
+    """
+    if pending is None:
+        pending = pending_changes(user_id)
+    if not pending:
+        return docs
+    by_id = {str(d['_id']): d for d in docs}
+    for eid, (kind, data) in pending.items():
+        if kind == 'delete':
+            by_id.pop(eid, None)
+        elif kind == 'insert':
+            if matches(data):
+                by_id[eid] = data
+        elif eid in by_id:
+            merged = {**by_id[eid], **data}
+            if matches(merged):
+                by_id[eid] = merged
+            else:
+                del by_id[eid]
+    return list(by_id.values())
+
+
+def _run():
+    while not _stop.is_set():
+        try:
+            while flush() and not _stop.is_set():
+                pass                      # keep draining while batches are full
+        except Exception:                 # never let the flusher thread die
+            logger.exception("write-behind: flush failed")
+        _wakeup.wait(FLUSH_INTERVAL)
+        _wakeup.clear()
+
+
+def start_worker():
+    """
+    Start the background flusher once per process.
+    """
+    global _worker
+    with _lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = threading.Thread(target=_run, name='write-behind', daemon=True)
+            _worker.start()
+
+
+@atexit.register
+def _shutdown():
+    if _worker is None:
+        return
+    _stop.set()
+    _wakeup.set()
+    _worker.join(timeout=5)
+    try:
+        flush()
+    except Exception:
+        pass                              # rows stay journaled for the next start
+
+
+if ENABLED:
+    start_worker()                        # drain anything left by a previous run
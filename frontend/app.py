@@ -9,18 +9,32 @@ if str(project_root) not in sys.path:
 # ──────────────────────────────────────────────────────────────────────────────
 
 from backend.auth import register, login
-from backend.expenses import add_expense, fetch_expenses, update_expense, delete_expense
-from backend.analytics import monthly_summary, yearly_summary, category_trend
+from backend.expenses import (
+    add_expense,
+    fetch_expenses,
+    update_expense,
+    delete_expense,
+    search_expenses,
+    category_suggestions
+)
+from backend.analytics import monthly_summary, yearly_summary, category_trend, spending_insights
 from backend.group import (
     list_user_groups,
     create_group,
+    list_group_members,
     add_group_expense,
     compute_group_balances
 )
-from backend.visuals import plot_monthly, plot_category, plot_yearly
+from backend import write_behind
+from backend.vega import CHART_MODE, spec_monthly, spec_yearly, spec_category
+if CHART_MODE != 'vega':
+    from backend.visuals import plot_monthly, plot_category, plot_yearly
 
 st.set_page_config(page_title='Dollar Bill Tracker', layout="wide")
 
+# Expenses listed in View/Edit and Delete when no search is entered
+RECENT_LIMIT = 20
+
 # ─── Custom CSS ──────────────────────────────────────────
 st.markdown(
     """
@@ -112,6 +126,15 @@ else:
     user_id = st.session_state.user_id
     username = st.session_state.username
     
+    # Write-behind mode: summaries and balances only include saved changes
+    if write_behind.ENABLED:
+        pending, dead = write_behind.user_backlog(user_id)
+        if pending:
+            st.info(f"{pending} expense change(s) are still being saved. Totals, charts, "
+                    f"suggestions and group balances will include them once saved.")
+        if dead:
+            st.error(f"{dead} expense change(s) could not be saved. Please re-enter them.")
+    
     # Create tabs for navigation
     tab1, tab2, tab3, tab4, tab5 = st.tabs(['Dashboard', 'Expenses', 'Analytics', 'Groups', 'Logout'])
     
@@ -119,6 +142,16 @@ else:
     with tab1:
         st.title('Dashboard')
         #st.write(f"Hello, **{username}**! What would you like to do today?")
+        insights = spending_insights(user_id)
+        if insights:
+            st.subheader('This Month')
+            col1, col2 = st.columns(2)
+            col1.metric('Spent so far', f"${insights['month_to_date']:.2f}")
+            col2.metric('Projected month-end', f"${insights['projected_month_end']:.2f}")
+            for a in insights['anomalies']:
+                st.warning(f"Unusual {a['category']} spending on {a['date'].date()}: "
+                           f"${a['amount']:.2f} vs a typical ${a['baseline']:.2f}")
+            st.caption(f"As of {insights['as_of'].date()}")
         user_groups = list_user_groups(user_id)
         if user_groups:
             st.subheader('Your Groups')
@@ -148,6 +181,13 @@ else:
             st.header('Add New Expense')
             amt  = st.number_input('Amount', min_value=0.0, step=0.01, key='new_amt')
             cat  = st.text_input('Category', key='new_cat')
+            # Autocomplete from the user's existing categories
+            typed_cat   = cat
+            suggestions = [c for c in category_suggestions(user_id, typed_cat) if c != typed_cat] if typed_cat else []
+            if suggestions:
+                cat = st.selectbox('Matching categories', [typed_cat] + suggestions,
+                                   format_func=lambda c: f"{c} (as typed)" if c == typed_cat else c,
+                                   key='new_cat_pick')
             date = st.date_input('Date', key='new_date')
             desc = st.text_input('Description', key='new_desc')
             if st.button('Add Expense', key='add_btn'):
@@ -158,11 +198,18 @@ else:
         with expense_tab2:
             st.header('View and Update Expenses')
             
-            # Fetch and display expenses
-            expenses = fetch_expenses(user_id)
+            # Search by description, or show the most recent expenses
+            edit_query = st.text_input('Search descriptions', key='edit_search')
+            try:
+                expenses = (search_expenses(user_id, edit_query) if edit_query.strip()
+                            else fetch_expenses(user_id, limit=RECENT_LIMIT))
+            except Exception as e:
+                st.error(f"Error searching expenses: {str(e)}")
+                expenses = []
             
             if not expenses:
-                st.info("You don't have any expenses yet.")
+                st.info("No matching expenses." if edit_query.strip()
+                        else "You don't have any expenses yet.")
             else:
                 # Create a selection box for expenses
                 expense_options = [f"{e['date'].date()} - {e['category']} - ${e['amount']:.2f} - {e['description']}" for e in expenses]
@@ -210,11 +257,18 @@ else:
         with expense_tab3:
             st.header('Delete Expense')
             
-            # Fetch and display expenses for deletion
-            expenses = fetch_expenses(user_id)
+            # Search by description, or show the most recent expenses
+            delete_query = st.text_input('Search descriptions', key='delete_search')
+            try:
+                expenses = (search_expenses(user_id, delete_query) if delete_query.strip()
+                            else fetch_expenses(user_id, limit=RECENT_LIMIT))
+            except Exception as e:
+                st.error(f"Error searching expenses: {str(e)}")
+                expenses = []
             
             if not expenses:
-                st.info("You don't have any expenses to delete.")
+                st.info("No matching expenses." if delete_query.strip()
+                        else "You don't have any expenses to delete.")
             else:
                 # Create a selection box for expenses
                 expense_options = [f"{e['date'].date()} - {e['category']} - ${e['amount']:.2f} - {e['description']}" for e in expenses]
@@ -253,8 +307,11 @@ else:
         try:
             monthly_data = monthly_summary(user_id)
             if monthly_data and len(monthly_data) > 0:
-                monthly_img = plot_monthly(monthly_data)
-                st.image(monthly_img)
+                if CHART_MODE == 'vega':
+                    st.vega_lite_chart(spec_monthly(monthly_data), use_container_width=True)
+                else:
+                    monthly_img = plot_monthly(monthly_data)
+                    st.image(monthly_img)
             else:
                 st.info("No monthly data available yet. Add some expenses to see your monthly summary.")
         except Exception as e:
@@ -266,8 +323,11 @@ else:
         try:
             yearly_data = yearly_summary(user_id)
             if yearly_data and len(yearly_data) > 0:
-                yearly_img = plot_yearly(yearly_data)
-                st.image(yearly_img)
+                if CHART_MODE == 'vega':
+                    st.vega_lite_chart(spec_yearly(yearly_data), use_container_width=True)
+                else:
+                    yearly_img = plot_yearly(yearly_data)
+                    st.image(yearly_img)
             else:
                 st.info("No yearly data available yet. Add some expenses to see your yearly summary.")
         except Exception as e:
@@ -279,8 +339,11 @@ else:
         try:
             category_data = category_trend(user_id)
             if category_data and len(category_data) > 0:
-                category_img = plot_category(category_data)
-                st.image(category_img)
+                if CHART_MODE == 'vega':
+                    st.vega_lite_chart(spec_category(category_data), use_container_width=True)
+                else:
+                    category_img = plot_category(category_data)
+                    st.image(category_img)
             else:
                 st.info("No category data available yet. Add expenses with categories to see this breakdown.")
         except Exception as e:
@@ -314,6 +377,19 @@ else:
             cat_g   = st.text_input('Category', key='g_cat')
             date_g  = st.date_input('Date', key='g_date')
             desc_g  = st.text_input('Description', key='g_desc')
+
+            # Who shares this expense, and how
+            members_g = list_group_members(grp_for_exp)
+            split_g   = st.radio('Split', ['Equal', 'Percentage', 'Exact amounts'],
+                                 horizontal=True, key='g_split')
+            parts_g   = st.multiselect('Split between', members_g, default=members_g, key='g_parts')
+            shares_g  = None
+            if split_g != 'Equal':
+                unit = '%' if split_g == 'Percentage' else '$'
+                shares_g = {
+                    m: st.number_input(f"{m} ({unit})", min_value=0.0, step=0.01, key=f'g_share_{m}')
+                    for m in parts_g
+                }
             if st.button('Add Group Expense'):
                 try:
                     add_group_expense(
@@ -322,7 +398,10 @@ else:
                         amt_g,
                         cat_g,
                         date_g.isoformat(),
-                        desc_g
+                        desc_g,
+                        split={'Equal': 'equal', 'Percentage': 'percentage'}.get(split_g, 'exact'),
+                        participants=parts_g,
+                        shares=shares_g
                     )
                     st.success('Group expense added')
                 except Exception as e:
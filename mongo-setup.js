@@ -28,7 +28,19 @@ const expenseSchema = {
       date:       { bsonType: "date" },
       description:{ bsonType: "string" },
       group_id:   { bsonType: ["objectId","null"] },
-      payer_id:   { bsonType: ["objectId","null"] }
+      payer_id:   { bsonType: ["objectId","null"] },
+      split:      { enum: ["equal","percentage","exact"] },
+      participants: {
+        bsonType: "array",
+        items: {
+          bsonType: "object",
+          required: ["user_id","weight"],
+          properties: {
+            user_id: { bsonType: "objectId" },
+            weight:  { bsonType: ["double","int","decimal"], minimum: 0 }
+          }
+        }
+      }
     }
   }
 };
@@ -77,16 +89,26 @@ db.expenses.createIndex({ user_id: 1 });
 db.expenses.createIndex({ date: 1 });
 db.expenses.createIndex({ category: 1 });
 db.expenses.createIndex({ group_id: 1 });
+// per-user description search and category autocomplete
+db.expenses.createIndex({ user_id: 1, description: "text" });
+db.expenses.createIndex({ user_id: 1, category: 1 });
+
+db.insights.createIndex({ user_id: 1 }, { unique: true });
 
 db.groups.createIndex({ name: 1 }, { unique: true });
 db.groups.createIndex({ members: 1 });
 
 // 3. Back-fill new fields on existing expense docs
+//    (only where missing, so re-running this script keeps group expenses intact)
 
 print("Adding default fields to existing expenses…");
 db.expenses.updateMany(
-  {}, 
-  { $set: { group_id: null, payer_id: null } }
+  { group_id: { $exists: false } },
+  { $set: { group_id: null } }
+);
+db.expenses.updateMany(
+  { payer_id: { $exists: false } },
+  { $set: { payer_id: null } }
 );
 
 // 4. (Optional) Seed a sample group called “Roommates”
@@ -0,0 +1,85 @@
+# scripts/bench_chart_modes.py
+#
+# Compare the two Analytics chart modes (CHART_MODE=png vs CHART_MODE=vega):
+# server CPU spent building the three charts of one Analytics view, and the
+# bytes each view sends to the browser.
+#
+#   python scripts/bench_chart_modes.py                 # synthetic data
+#   python scripts/bench_chart_modes.py --user <id>     # a real user's data
+
+import sys
+import json
+import time
+import random
+import argparse
+from pathlib import Path
+
+# ─── Make project root importable ─────────────────────────────────────────────
+project_root = Path(__file__).parent.parent.resolve()
+sys.path.insert(0, str(project_root))
+# ──────────────────────────────────────────────────────────────────────────────
+
+from backend.vega import spec_monthly, spec_yearly, spec_category
+
+
+def synthetic_view(months: int = 36, categories: int = 8):
+    """
+    Fake (monthly, yearly, category) aggregation results in the shape
+    returned by backend/analytics.py.
+    """
+    rng = random.Random(7)
+    monthly = [{'_id': {'year': 2022 + m // 12, 'month': m % 12 + 1},
+                'total': rng.uniform(200, 3000)} for m in range(months)]
+    yearly = {}
+    for rec in monthly:
+        yearly[rec['_id']['year']] = yearly.get(rec['_id']['year'], 0) + rec['total']
+    yearly = [{'_id': {'year': y}, 'total': t} for y, t in sorted(yearly.items())]
+    category = [{'_id': {'category': f'Category {c}'}, 'total': rng.uniform(50, 5000)}
+                for c in range(categories)]
+    return monthly, yearly, category
+
+
+def user_view(user_id: str):
+    from backend.analytics import monthly_summary, yearly_summary, category_trend
+    return monthly_summary(user_id), yearly_summary(user_id), category_trend(user_id)
+
+
+def render_png(monthly, yearly, category) -> int:
+    from backend.visuals import plot_monthly, plot_yearly, plot_category
+    return sum(len(buf.getbuffer()) for buf in
+               (plot_monthly(monthly), plot_yearly(yearly), plot_category(category)))
+
+
+def render_vega(monthly, yearly, category) -> int:
+    # Streamlit ships the spec as a JSON string inside the delta message
+    return sum(len(json.dumps(spec).encode('utf-8')) for spec in
+               (spec_monthly(monthly), spec_yearly(yearly), spec_category(category)))
+
+
+def measure(fn, view, repeats: int) -> tuple[float, int]:
+    fn(*view)  # warm-up: imports, font cache
+    cpu0 = time.process_time()
+    for _ in range(repeats):
+        size = fn(*view)
+    return (time.process_time() - cpu0) / repeats, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare PNG vs Vega-Lite chart modes.')
+    parser.add_argument('--user', help='benchmark this user_id instead of synthetic data')
+    parser.add_argument('--repeats', type=int, default=20)
+    args = parser.parse_args()
+
+    view = user_view(args.user) if args.user else synthetic_view()
+
+    import matplotlib
+    matplotlib.use('Agg')
+
+    print(f"{'mode':<6} {'CPU ms/view':>12} {'bytes/view':>12}")
+    for mode, fn in (('png', render_png), ('vega', render_vega)):
+        cpu, size = measure(fn, view, args.repeats)
+        print(f"{mode:<6} {cpu * 1000:>12.2f} {size:>12,}")
+
+
+if __name__ == "__main__":
+    main()
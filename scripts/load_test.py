@@ -0,0 +1,323 @@
+# scripts/load_test.py
+#
+# Concurrent-session load test for the Streamlit app.
+#
+# Starts `streamlit run frontend/app.py` (or attaches to a running server) and
+# drives N simulated browser sessions over Streamlit's websocket protocol:
+# login, add expense, rerun the page (Analytics is rendered on every rerun),
+# compute group balances. For each concurrency level it reports p50/p95/p99
+# rerun latency, MongoDB operations per rerun (from serverStatus opcounters,
+# so use a dedicated local mongod) and the server process' CPU and RSS.
+#
+#   MONGO_URI=mongodb://localhost:27017 python scripts/load_test.py --levels 1,5,10,25
+#   python scripts/load_test.py --url http://localhost:8501 --pid 12345
+#
+# CPU/RSS are read from /proc, so they are only reported on Linux.
+
+import sys
+import os
+import time
+import random
+import asyncio
+import argparse
+import subprocess
+import urllib.request
+from pathlib import Path
+
+import numpy as np
+from pymongo import MongoClient
+from tornado.websocket import websocket_connect, WebSocketClosedError
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+from streamlit.runtime.state.common import user_key_from_element_id
+
+# ─── Make project root importable ─────────────────────────────────────────────
+project_root = Path(__file__).parent.parent.resolve()
+sys.path.insert(0, str(project_root))
+# ──────────────────────────────────────────────────────────────────────────────
+
+USER_PREFIX = 'loadtest_'
+PASSWORD    = 'loadtest'
+TIMEOUT     = 60.0     # seconds to wait for one script run
+WIDGETS     = {'button', 'text_input', 'number_input', 'selectbox', 'date_input'}
+
+
+class Session:
+    """
+    One simulated browser tab: a websocket plus the widget values it has set.
+    """
+
+    def __init__(self, url: str, username: str, timeout: float = TIMEOUT):
+        self.ws_url   = url.replace('http', 'ws', 1).rstrip('/') + '/_stcore/stream'
+        self.username = username
+        self.timeout  = timeout
+        self.ws       = None
+        self.widgets  = {}     # (type, label or key) -> widget id, from the last run
+        self.values   = {}     # widget id -> WidgetState sent on every rerun
+        self.cache    = {}     # ForwardMsg hash -> msg, for ref_hash messages
+        self.errors   = 0
+        self._done    = None
+        self._reader  = None
+        self.closed   = False
+
+    async def connect(self):
+        self.ws = await websocket_connect(self.ws_url, subprotocols=['streamlit'])
+        self._reader = asyncio.ensure_future(self._read())
+
+    async def close(self):
+        if self.ws:
+            self.ws.close()
+        if self._reader:
+            await asyncio.gather(self._reader, return_exceptions=True)
+
+    async def _read(self):
+        try:
+            while True:
+                raw = await self.ws.read_message()
+                if raw is None:
+                    return
+                msg = ForwardMsg()
+                msg.ParseFromString(raw)
+                if msg.metadata.cacheable:
+                    self.cache[msg.hash] = msg
+                if msg.WhichOneof('type') == 'ref_hash':
+                    msg = self.cache.get(msg.ref_hash, msg)
+                self._handle(msg)
+        finally:
+            self.closed = True
+            # don't leave a rerun waiting on a socket that is gone
+            if self._done and not self._done.done():
+                self._done.set_exception(ConnectionError('websocket closed'))
+
+    def _handle(self, msg):
+        kind = msg.WhichOneof('type')
+        if kind == 'new_session':
+            self.widgets = {}
+        elif kind == 'delta' and msg.delta.WhichOneof('type') == 'new_element':
+            el = msg.delta.new_element
+            el_type = el.WhichOneof('type')
+            if el_type == 'exception':
+                self.errors += 1
+            elif el_type in WIDGETS:
+                widget = getattr(el, el_type)
+                self.widgets[(el_type, widget.label)] = widget.id
+                key = user_key_from_element_id(widget.id)
+                if key:
+                    self.widgets[(el_type, key)] = widget.id
+        elif kind == 'script_finished':
+            if msg.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN and self._done:
+                if not self._done.done():
+                    self._done.set_result(None)
+
+    def set(self, el_type: str, name: str, **value):
+        """
+        Set a widget (found by label or key) for the next rerun.
+        """
+        wid = self.widgets[(el_type, name)]
+        self.values[wid] = WidgetState(id=wid, **value)
+
+    async def rerun(self, trigger: tuple = None) -> float:
+        """
+        Send a rerun with all set widget values (plus an optional button
+        press) and wait for the script to finish. Returns latency in seconds;
+        raises TimeoutError or ConnectionError if the run never finishes.
+        """
+        states = list(self.values.values())
+        if trigger:
+            wid = self.widgets[('button', trigger[1])] if trigger[0] == 'button' else trigger[1]
+            states = [s for s in states if s.id != wid] + [WidgetState(id=wid, trigger_value=True)]
+        back = BackMsg()
+        back.rerun_script.widget_states.widgets.extend(states)
+        self._done = asyncio.get_running_loop().create_future()
+        start = time.perf_counter()
+        try:
+            await self.ws.write_message(back.SerializeToString(), binary=True)
+        except WebSocketClosedError:
+            raise ConnectionError('websocket closed') from None
+        await asyncio.wait_for(self._done, self.timeout)
+        return time.perf_counter() - start
+
+    # ─── Flows ────────────────────────────────────────────────────────────────
+
+    async def login(self) -> float:
+        await self.rerun()                       # initial page load
+        # the Login press reruns the script twice: once for the click, then
+        # again from st.rerun() once the user is in session_state
+        self.set('text_input', 'Username', string_value=self.username)
+        self.set('text_input', 'Password', string_value=PASSWORD)
+        latency = await self.rerun(('button', 'Login'))
+        self.values.clear()                      # login widgets are gone now
+        return latency
+
+    async def add_expense(self) -> float:
+        self.set('number_input', 'new_amt', double_value=round(random.uniform(1, 200), 2))
+        self.set('text_input', 'new_cat', string_value=random.choice(['Food', 'Transport', 'Fun']))
+        self.set('text_input', 'new_desc', string_value='load test expense')
+        return await self.rerun(('button', 'add_btn'))
+
+    async def open_analytics(self) -> float:
+        # All tabs (Analytics included) render server-side on every rerun
+        return await self.rerun()
+
+    async def compute_balances(self) -> float:
+        return await self.rerun(('button', 'Compute Balances'))
+
+
+# ─── Measurements ─────────────────────────────────────────────────────────────
+
+def mongo_ops(client) -> int:
+    counters = client.admin.command('serverStatus')['opcounters']
+    return sum(counters[k] for k in ('insert', 'query', 'update', 'delete', 'getmore', 'command'))
+
+
+def proc_stats(pid: int):
+    """
+    (cpu_seconds, rss_mb) of a process, or (None, None) off Linux.
+    """
+    try:
+        stat = Path(f'/proc/{pid}/stat').read_text().rsplit(')', 1)[1].split()
+        cpu = (int(stat[11]) + int(stat[12])) / os.sysconf('SC_CLK_TCK')
+        for line in Path(f'/proc/{pid}/status').read_text().splitlines():
+            if line.startswith('VmRSS:'):
+                return cpu, int(line.split()[1]) / 1024
+        return cpu, None
+    except (OSError, IndexError, ValueError):
+        return None, None
+
+
+# ─── Driver ───────────────────────────────────────────────────────────────────
+
+def prepare_users(n: int):
+    """
+    Ensure loadtest_<i> users exist, paired into two-member groups.
+    """
+    from backend.auth import register
+    from backend.db import groups_col
+    from backend.group import create_group
+
+    names = [f'{USER_PREFIX}{i}' for i in range(n)]
+    for name in names:
+        register(name, PASSWORD)                 # no-op if it already exists
+    for i in range(0, n, 2):
+        group = f'{USER_PREFIX}group_{i // 2}'
+        if not groups_col.find_one({'name': group}):
+            create_group(group, names[i:i + 2])
+    return names
+
+
+def cleanup():
+    from backend.db import users_col, expenses_col, groups_col
+
+    regex = {'$regex': f'^{USER_PREFIX}'}
+    ids = [u['_id'] for u in users_col.find({'username': regex}, {'_id': 1})]
+    expenses_col.delete_many({'user_id': {'$in': ids}})
+    groups_col.delete_many({'name': regex})
+    users_col.delete_many({'_id': {'$in': ids}})
+    print(f"🧹 Removed {len(ids)} load-test users and their data")
+
+
+async def run_session(session: Session, deadline: float, think: float, samples: list):
+    flows = [session.add_expense, session.open_analytics, session.compute_balances]
+    while time.perf_counter() < deadline:
+        for flow in flows:
+            try:
+                samples.append(await flow())
+            except (asyncio.TimeoutError, ConnectionError, KeyError):
+                # KeyError: the last run failed before rendering this flow's widgets
+                session.errors += 1
+                if session.closed:
+                    return                       # connection lost; stop this session
+            if think:
+                await asyncio.sleep(random.uniform(0, think))
+
+
+async def try_login(session: Session):
+    try:
+        return await session.login()
+    except (asyncio.TimeoutError, ConnectionError, KeyError):
+        session.errors += 1                      # KeyError: login form never rendered
+        return None
+
+
+async def run_level(url: str, users: list, duration: float, think: float, timeout: float):
+    sessions = [Session(url, name, timeout) for name in users]
+    await asyncio.gather(*(s.connect() for s in sessions))
+    login = await asyncio.gather(*(try_login(s) for s in sessions))
+    active = [s for s, latency in zip(sessions, login) if latency is not None]
+    samples = []
+    deadline = time.perf_counter() + duration
+    await asyncio.gather(*(run_session(s, deadline, think, samples) for s in active))
+    await asyncio.gather(*(s.close() for s in sessions))
+    return [x for x in login if x is not None], samples, sum(s.errors for s in sessions)
+
+
+def start_server(port: int):
+    cmd = [sys.executable, '-m', 'streamlit', 'run', str(project_root / 'frontend' / 'app.py'),
+           '--server.headless', 'true', '--server.port', str(port),
+           '--browser.gatherUsageStats', 'false']
+    proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f'http://localhost:{port}'
+    for _ in range(100):
+        try:
+            urllib.request.urlopen(f'{url}/_stcore/health', timeout=1)
+            return proc, url
+        except OSError:
+            time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError('Streamlit server did not become healthy')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load-test the Streamlit app with concurrent sessions.')
+    parser.add_argument('--levels', default='1,5,10,25,50',
+                        help='comma-separated concurrent session counts')
+    parser.add_argument('--duration', type=float, default=30, help='seconds per level')
+    parser.add_argument('--think', type=float, default=0.5,
+                        help='max random pause between actions, seconds')
+    parser.add_argument('--url', help='attach to a running server instead of starting one')
+    parser.add_argument('--pid', type=int, help='server pid for CPU/RSS when using --url')
+    parser.add_argument('--port', type=int, default=8599)
+    parser.add_argument('--timeout', type=float, default=TIMEOUT,
+                        help='seconds before a rerun counts as an error')
+    parser.add_argument('--cleanup', action='store_true',
+                        help='delete load-test users, groups and expenses afterwards')
+    args = parser.parse_args()
+
+    from backend.db import MONGO_URI
+    mongo = MongoClient(MONGO_URI, serverSelectionTimeoutMS=5000)
+
+    levels = [int(x) for x in args.levels.split(',')]
+    users = prepare_users(max(levels))
+    print(f"✅ {len(users)} load-test users ready")
+
+    proc, url, pid = None, args.url, args.pid
+    if not url:
+        proc, url = start_server(args.port)
+        pid = proc.pid
+    try:
+        print(f"{'sessions':>8} {'reruns':>7} {'rerun/s':>8} {'p50 ms':>8} {'p95 ms':>8} "
+              f"{'p99 ms':>8} {'login p95':>9} {'ops/rerun':>9} {'CPU %':>6} {'RSS MB':>7} {'errors':>6}")
+        for level in levels:
+            ops0, (cpu0, _), t0 = mongo_ops(mongo), proc_stats(pid), time.perf_counter()
+            login, samples, errors = asyncio.run(run_level(url, users[:level], args.duration,
+                                                          args.think, args.timeout))
+            ops1, (cpu1, rss), t1 = mongo_ops(mongo), proc_stats(pid), time.perf_counter()
+
+            reruns = max(len(samples) + 3 * len(login), 1)   # login = page load + 2 runs
+            p50, p95, p99 = np.percentile(samples, [50, 95, 99]) * 1000 if samples else (0, 0, 0)
+            cpu = f"{100 * (cpu1 - cpu0) / (t1 - t0):6.0f}" if cpu0 is not None else '   n/a'
+            rss = f"{rss:7.0f}" if rss is not None else '    n/a'
+            print(f"{level:>8} {len(samples):>7} {len(samples) / args.duration:>8.1f} "
+                  f"{p50:>8.0f} {p95:>8.0f} {p99:>8.0f} {np.percentile(login, 95) * 1000 if login else 0:>9.0f} "
+                  f"{(ops1 - ops0) / reruns:>9.1f} {cpu} {rss} {errors:>6}")
+    finally:
+        if proc:
+            proc.terminate()
+            proc.wait()
+        if args.cleanup:
+            cleanup()
+
+
+if __name__ == "__main__":
+    main()
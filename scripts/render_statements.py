@@ -0,0 +1,230 @@
+# scripts/render_statements.py
+#
+# Render a monthly statement (trend + category breakdown) for every user.
+#
+#   python scripts/render_statements.py --month 2025-04 --out statements/
+#   python scripts/render_statements.py --benchmark 2000 --workers 8
+#
+# All aggregates come from two pipelines over the whole expenses collection
+# (not one query per user); rendering is fanned out over a process pool.
+# Statements are written atomically as <out>/<YYYY-MM>/<user_id>.<fmt>, so a
+# crashed run can simply be restarted: users whose file exists are skipped.
+
+import sys
+import os
+import time
+import random
+import argparse
+import tempfile
+from pathlib import Path
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# ─── Make project root importable ─────────────────────────────────────────────
+project_root = Path(__file__).parent.parent.resolve()
+sys.path.insert(0, str(project_root))
+# ──────────────────────────────────────────────────────────────────────────────
+
+TREND_MONTHS = 12
+CHUNK_SIZE   = 64
+
+
+def month_bounds(month: str, months_back: int = 0) -> tuple[datetime, datetime]:
+    """
+    Return [start, end) for the ISO month `month` ('YYYY-MM'), with start
+    moved `months_back` months earlier.
+    """
+    year, mon = (int(p) for p in month.split('-'))
+    end = datetime(year + (mon == 12), mon % 12 + 1, 1)
+    idx = year * 12 + (mon - 1) - months_back
+    start = datetime(idx // 12, idx % 12 + 1, 1)
+    return start, end
+
+
+def fetch_aggregates(month: str) -> dict:
+    """
+    Pull every user's statement data in a few large queries.
+    Returns {user_id: {'username', 'monthly', 'category'}}.
+    """
+    from backend.db import users_col, expenses_col
+
+    trend_start, end = month_bounds(month, TREND_MONTHS - 1)
+    month_start, _   = month_bounds(month)
+
+    monthly_pipeline = [
+        {'$match': {'date': {'$gte': trend_start, '$lt': end}}},
+        {'$group': {
+            '_id': {'user_id': '$user_id',
+                    'year':  {'$year':  {'$toDate': '$date'}},
+                    'month': {'$month': {'$toDate': '$date'}}},
+            'total': {'$sum': '$amount'}
+        }}
+    ]
+    category_pipeline = [
+        {'$match': {'date': {'$gte': month_start, '$lt': end}}},
+        {'$group': {
+            '_id': {'user_id': '$user_id', 'category': '$category'},
+            'total': {'$sum': '$amount'}
+        }},
+        {'$sort': {'total': -1}}
+    ]
+
+    data = {}
+    for rec in expenses_col.aggregate(monthly_pipeline, allowDiskUse=True):
+        key = rec['_id']
+        entry = data.setdefault(str(key['user_id']), {'monthly': [], 'category': []})
+        entry['monthly'].append({'_id': {'year': key['year'], 'month': key['month']},
+                                 'total': rec['total']})
+    for rec in expenses_col.aggregate(category_pipeline, allowDiskUse=True):
+        key = rec['_id']
+        entry = data.setdefault(str(key['user_id']), {'monthly': [], 'category': []})
+        entry['category'].append({'_id': key['category'], 'total': rec['total']})
+
+    for user in users_col.find({}, {'username': 1}):
+        uid = str(user['_id'])
+        if uid in data:
+            data[uid]['username'] = user['username']
+    return data
+
+
+def synthetic_aggregates(n_users: int, month: str) -> dict:
+    """
+    Fake statement data shaped like fetch_aggregates(), for benchmarking
+    rendering without a database.
+    """
+    rng = random.Random(42)
+    year, mon = (int(p) for p in month.split('-'))
+    categories = ['Food', 'Transport', 'Groceries', 'Rent', 'Utilities', 'Fun']
+    data = {}
+    for i in range(n_users):
+        monthly = []
+        for back in range(TREND_MONTHS):
+            idx = year * 12 + (mon - 1) - back
+            monthly.append({'_id': {'year': idx // 12, 'month': idx % 12 + 1},
+                            'total': round(rng.uniform(100, 2000), 2)})
+        category = [{'_id': c, 'total': round(rng.uniform(10, 500), 2)}
+                    for c in rng.sample(categories, rng.randint(2, len(categories)))]
+        data[f'bench{i:08d}'] = {'username': f'user{i}', 'monthly': monthly,
+                                 'category': category}
+    return data
+
+
+# ─── Worker side ──────────────────────────────────────────────────────────────
+
+def _init_worker():
+    """
+    Per-process setup: headless backend and a single import of the chart code.
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+    matplotlib.rcParams['figure.max_open_warning'] = 0
+    import backend.visuals  # noqa: F401  (warm the import once per worker)
+
+
+def _render_chunk(jobs, out_dir, month, fmt):
+    """
+    Render a list of (user_id, entry) jobs. A user that fails to render is
+    skipped so the rest of the chunk still goes through.
+    Returns (written, failed) where failed is a list of (user_id, error).
+    """
+    import matplotlib.pyplot as plt
+    from backend.visuals import plot_statement
+
+    written, failed = 0, []
+    for user_id, entry in jobs:
+        target = Path(out_dir) / f'{user_id}.{fmt}'
+        title = f"{entry.get('username', user_id)} — statement for {month}"
+        try:
+            buf = plot_statement(title, entry['monthly'], entry['category'], fmt=fmt)
+        except Exception as exc:
+            plt.close('all')                     # don't leak the half-drawn figure
+            failed.append((user_id, repr(exc)))
+            continue
+        fd, tmp = tempfile.mkstemp(dir=out_dir, suffix='.part')
+        with os.fdopen(fd, 'wb') as fh:
+            fh.write(buf.getbuffer())
+        os.replace(tmp, target)
+        written += 1
+    return written, failed
+
+
+# ─── Driver ───────────────────────────────────────────────────────────────────
+
+def render_all(data: dict, out_dir: Path, month: str, fmt: str = 'png',
+               workers: int = None, chunk_size: int = CHUNK_SIZE) -> tuple[int, list, float]:
+    """
+    Render statements for every user in `data` not already present in
+    `out_dir`. Returns (rendered_count, failed, elapsed_seconds), failed
+    being a list of (user_id, error) for users that could not be rendered.
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for stale in out_dir.glob('*.part'):
+        stale.unlink()
+    done = {p.stem for p in out_dir.glob(f'*.{fmt}')}
+    pending = [(uid, entry) for uid, entry in data.items() if uid not in done]
+    if done:
+        print(f"↻ Resuming: {len(done)} statements already rendered, {len(pending)} to go")
+
+    chunks = [pending[i:i + chunk_size] for i in range(0, len(pending), chunk_size)]
+    rendered, failed = 0, []
+    start = time.perf_counter()
+    last_report = start
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        futures = [pool.submit(_render_chunk, chunk, str(out_dir), month, fmt)
+                   for chunk in chunks]
+        for fut in as_completed(futures):
+            written, errors = fut.result()
+            rendered += written
+            failed += errors
+            for user_id, error in errors:
+                print(f"  ⚠️ {user_id}: {error}")
+            now = time.perf_counter()
+            if now - last_report >= 2 or rendered + len(failed) == len(pending):
+                rate = rendered / (now - start) if now > start else 0.0
+                print(f"  {rendered}/{len(pending)} rendered, {len(failed)} failed "
+                      f"({rate:.1f} users/s)")
+                last_report = now
+    return rendered, failed, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Render monthly statements for all users.')
+    parser.add_argument('--month', default=datetime.now().strftime('%Y-%m'),
+                        help="statement month as YYYY-MM (default: current month)")
+    parser.add_argument('--out', default='statements', help='output directory')
+    parser.add_argument('--format', choices=['png', 'pdf'], default='png')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='worker processes (default: all cores)')
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE,
+                        help='users per worker task')
+    parser.add_argument('--benchmark', type=int, metavar='N_USERS',
+                        help='render N synthetic users into a temp dir and report throughput')
+    args = parser.parse_args()
+
+    if args.benchmark:
+        data = synthetic_aggregates(args.benchmark, args.month)
+        with tempfile.TemporaryDirectory() as tmp:
+            rendered, failed, elapsed = render_all(data, Path(tmp), args.month, args.format,
+                                                   args.workers, args.chunk_size)
+        print(f"🏁 {rendered} users in {elapsed:.1f}s → "
+              f"{rendered / elapsed:.1f} users/s ({args.workers or os.cpu_count()} workers)"
+              + (f", {len(failed)} failed" if failed else ''))
+        return
+
+    t0 = time.perf_counter()
+    data = fetch_aggregates(args.month)
+    print(f"✅ Loaded aggregates for {len(data)} users in {time.perf_counter() - t0:.1f}s")
+
+    out_dir = Path(args.out) / args.month
+    rendered, failed, elapsed = render_all(data, out_dir, args.month, args.format,
+                                           args.workers, args.chunk_size)
+    rate = rendered / elapsed if elapsed else 0.0
+    print(f"🎉 Rendered {rendered} statements into {out_dir} ({rate:.1f} users/s)")
+    if failed:
+        print(f"⚠️ {len(failed)} users failed to render: "
+              f"{', '.join(user_id for user_id, _ in failed[:20])}"
+              + (' …' if len(failed) > 20 else ''))
+
+
+if __name__ == "__main__":
+    main()